@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Distributed file processor - shards the manifest across worker processes/hosts
+
+The manifest is loaded into a SQLite work queue that every worker opens from a
+shared filesystem. Workers claim batches under time-limited leases, heartbeat
+while they work, and write results back idempotently (one row per task).
+Expired leases are handed to the next worker that asks for work, so a crashed
+worker only delays its batch; a task whose lease has expired max-attempts
+times is marked failed instead. The merged report is built with the same
+SequentialProcessor.generate_report() used by the single-node run.
+
+Usage:
+    process-files-distributed.py init   [--db Q] [--manifest M] [--reset]
+    process-files-distributed.py work   [--db Q] [--batch-size N] [--lease S] [--max-attempts A]
+    process-files-distributed.py report [--db Q] [--output R] [--partial]
+    process-files-distributed.py local  [--db Q] [--manifest M] [--workers N]
+
+The queue uses SQLite's default rollback journal rather than WAL, since WAL
+needs shared memory and does not work across hosts on a network filesystem.
+Lease expiry compares wall clocks, so hosts should be kept in sync (NTP).
+"""
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# The sequential script has a hyphenated filename, so load it by path
+_spec = importlib.util.spec_from_file_location(
+    'process_files_sequential',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'process-files-sequential.py')
+)
+_sequential = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_sequential)
+SequentialProcessor = _sequential.SequentialProcessor
+dump_report = _sequential.dump_report
+
+# size_kb has no declared type so SQLite keeps ints as ints and floats as floats
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    type TEXT NOT NULL,
+    size_kb NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_state_id ON tasks (state, id);
+CREATE TABLE IF NOT EXISTS results (
+    task_id INTEGER PRIMARY KEY REFERENCES tasks (id),
+    worker TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+
+class LeaseQueue:
+    def __init__(self, db_path, lease_seconds=30, max_attempts=3, timeout=60):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit mode so transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+
+    def close(self):
+        self.conn.close()
+
+    def init(self, manifest_path, reset=False):
+        """Create the queue tables and load the manifest into an empty queue"""
+        with open(manifest_path, 'r') as f:
+            files = json.load(f)
+
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            if reset:
+                self.conn.execute("DROP TABLE IF EXISTS results")
+                self.conn.execute("DROP TABLE IF EXISTS tasks")
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    self.conn.execute(statement)
+            if self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+                raise RuntimeError(f"{self.db_path} already holds a queue; use --reset to replace it")
+            self.conn.executemany(
+                "INSERT INTO tasks (id, filename, path, type, size_kb) VALUES (?, ?, ?, ?, ?)",
+                [(i, f['filename'], f['path'], f['type'], f['size_kb']) for i, f in enumerate(files)]
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return len(files)
+
+    def claim(self, worker_id, batch_size):
+        """Lease up to batch_size pending tasks, topping up from expired leases"""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Pending tasks come straight off the (state, id) index in id order
+            rows = self.conn.execute(
+                """SELECT id, filename, path, type, size_kb FROM tasks
+                   WHERE state = 'pending' ORDER BY id LIMIT ?""",
+                (batch_size,)
+            ).fetchall()
+
+            if len(rows) < batch_size:
+                # Leases that expired too often are given up on rather than retried forever
+                self.conn.execute(
+                    """UPDATE tasks SET state = 'failed', lease_owner = NULL, lease_expires = NULL
+                       WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                    (now, self.max_attempts)
+                )
+                rows += self.conn.execute(
+                    """SELECT id, filename, path, type, size_kb FROM tasks
+                       WHERE state = 'leased' AND lease_expires < ? ORDER BY id LIMIT ?""",
+                    (now, batch_size - len(rows))
+                ).fetchall()
+
+            self.conn.executemany(
+                """UPDATE tasks SET state = 'leased', lease_owner = ?, lease_expires = ?,
+                   attempts = attempts + 1 WHERE id = ?""",
+                [(worker_id, now + self.lease_seconds, row[0]) for row in rows]
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        return [
+            {'id': r[0], 'filename': r[1], 'path': r[2], 'type': r[3], 'size_kb': r[4], 'claimed_at': now}
+            for r in rows
+        ]
+
+    def heartbeat(self, worker_id):
+        """Extend every lease still held by worker_id; returns how many were extended"""
+        cursor = self.conn.execute(
+            "UPDATE tasks SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ?",
+            (time.time() + self.lease_seconds, worker_id)
+        )
+        return cursor.rowcount
+
+    def complete(self, worker_id, finished):
+        """Record a batch of (task, result) pairs; the first result written for a task wins"""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.executemany(
+                """INSERT OR IGNORE INTO results (task_id, worker, claimed_at, finished_at, payload)
+                   VALUES (?, ?, ?, ?, ?)""",
+                [(task['id'], worker_id, task['claimed_at'], now, json.dumps(result))
+                 for task, result in finished]
+            )
+            self.conn.executemany(
+                "UPDATE tasks SET state = 'done', lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                [(task['id'],) for task, _ in finished]
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def counts(self):
+        """Return {state: count} for the task table"""
+        return dict(self.conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+
+class Heartbeat(threading.Thread):
+    """Background thread that keeps a worker's leases alive while it processes"""
+
+    def __init__(self, db_path, worker_id, lease_seconds):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        # Give up on a locked database well within one tick so the retry lands before the lease expires
+        queue = LeaseQueue(self.db_path, self.lease_seconds, timeout=self.lease_seconds / 6)
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                try:
+                    queue.heartbeat(self.worker_id)
+                except sqlite3.OperationalError as e:
+                    # Usually "database is locked" under contention; try again next tick
+                    print(f"Heartbeat for {self.worker_id} failed: {e}")
+        finally:
+            queue.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_worker(db_path, batch_size=10, lease_seconds=30, max_attempts=3, poll_interval=1.0, worker_id=None):
+    """Claim and process batches until every task in the queue is done or failed"""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    queue = LeaseQueue(db_path, lease_seconds, max_attempts)
+    processor = SequentialProcessor()
+    heartbeat = Heartbeat(db_path, worker_id, lease_seconds)
+    heartbeat.start()
+    processed = 0
+
+    try:
+        while True:
+            batch = queue.claim(worker_id, batch_size)
+            if not batch:
+                counts = queue.counts()
+                if counts.get('pending', 0) == 0 and counts.get('leased', 0) == 0:
+                    break
+                # Other workers hold live leases; wait in case one of them expires
+                time.sleep(poll_interval)
+                continue
+
+            finished = []
+            for task in batch:
+                result = processor.process_file(task['path'])
+                result['file_type'] = task['type']
+                result['declared_size_kb'] = task['size_kb']
+                finished.append((task, result))
+            queue.complete(worker_id, finished)
+            processed += len(finished)
+    finally:
+        heartbeat.stop()
+        queue.close()
+
+    print(f"Worker {worker_id} processed {processed} files")
+    return processed
+
+
+def merge_report(db_path, partial=False):
+    """
+    Build the merged report from the queue's results table.
+
+    Returns (report, results): the report has no file_results, which are
+    streamed from the ResultStore by save_report(). Refuses while tasks are
+    still pending or leased unless partial is set.
+    """
+    queue = LeaseQueue(db_path)
+    try:
+        counts = queue.counts()
+        unfinished = counts.get('pending', 0) + counts.get('leased', 0)
+        if unfinished and not partial:
+            raise RuntimeError(f"{unfinished} tasks are still pending or leased; use --partial to report anyway")
+
+        processor = SequentialProcessor()
+        start_time = end_time = None
+        rows = queue.conn.execute(
+            """SELECT t.filename, t.type, t.size_kb, t.attempts, r.claimed_at, r.finished_at, r.payload
+               FROM tasks t LEFT JOIN results r ON r.task_id = t.id
+               WHERE r.task_id IS NOT NULL OR t.state = 'failed'
+               ORDER BY t.id"""
+        )
+        for filename, file_type, size_kb, attempts, claimed_at, finished_at, payload in rows:
+            if payload is None:
+                # Given up on after repeated lease expiry; report it as a failed file
+                result = {
+                    'filename': filename,
+                    'status': 'error',
+                    'error': f"lease expired {attempts} times",
+                    'process_time': 0.0,
+                    'file_type': file_type,
+                    'declared_size_kb': size_kb
+                }
+            else:
+                result = json.loads(payload)
+                start_time = claimed_at if start_time is None else min(start_time, claimed_at)
+                end_time = finished_at if end_time is None else max(end_time, finished_at)
+            processor.results.append(result)
+    finally:
+        queue.close()
+
+    processor.start_time = start_time or 0
+    processor.end_time = end_time or 0
+
+    report = processor.generate_report(include_file_results=False)
+    report['method'] = 'distributed'
+    if unfinished:
+        report['summary']['unfinished'] = unfinished
+    return report, processor.results
+
+
+def save_report(report, results, output_path):
+    with open(output_path, 'w') as f:
+        dump_report(report, results.as_dicts(), f)
+
+    print("\n=== Distributed Processing Summary ===")
+    print(f"Total Time: {report['summary']['total_time']:.2f} seconds")
+    print(f"Files Processed: {report['summary']['total_files']}")
+    print(f"Success Rate: {report['summary']['successful']}/{report['summary']['total_files']}")
+    print(f"Files per Second: {report['summary']['files_per_second']:.2f}")
+    if 'unfinished' in report['summary']:
+        print(f"Partial report: {report['summary']['unfinished']} tasks not finished")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['init', 'work', 'report', 'local'])
+    parser.add_argument('--db', default='results/queue.db', help='shared SQLite queue file')
+    parser.add_argument('--manifest', default='test-data/manifest.json')
+    parser.add_argument('--output', default='results/distributed-report.json')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes for "local"')
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--lease', type=float, default=30, help='lease length in seconds')
+    parser.add_argument('--max-attempts', type=int, default=3, help='leases per task before it is marked failed')
+    parser.add_argument('--reset', action='store_true', help='replace an existing queue on "init"')
+    parser.add_argument('--partial', action='store_true', help='allow "report" while tasks are unfinished')
+    args = parser.parse_args()
+
+    if args.command in ('init', 'local'):
+        queue = LeaseQueue(args.db, args.lease, args.max_attempts)
+        try:
+            # "local" always runs a fresh queue
+            total = queue.init(args.manifest, reset=args.reset or args.command == 'local')
+        except RuntimeError as e:
+            parser.exit(1, f"{e}\n")
+        finally:
+            queue.close()
+        print(f"Queued {total} files in {args.db}")
+
+    if args.command == 'work':
+        run_worker(args.db, args.batch_size, args.lease, args.max_attempts)
+
+    if args.command == 'local':
+        workers = [
+            multiprocessing.Process(
+                target=run_worker, args=(args.db, args.batch_size, args.lease, args.max_attempts)
+            )
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    if args.command in ('report', 'local'):
+        try:
+            report, results = merge_report(args.db, args.partial)
+        except RuntimeError as e:
+            parser.exit(1, f"{e}\n")
+        save_report(report, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
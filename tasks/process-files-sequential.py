@@ -6,12 +6,210 @@ import json
 import time
 import os
 import re
+from array import array
 from collections import Counter
 from datetime import datetime
+from itertools import compress
+
+# Sentinel for numeric fields a record does not carry (e.g. csv_rows on a log file)
+MISSING = -1
+
+# 'success' is 1 so the status column doubles as the success mask
+STATUS_CODES = ('error', 'success')
+LOG_LEVELS = ('INFO', 'WARNING', 'ERROR', 'DEBUG')
+
+# Range of the 'q' columns; values outside it are rejected before any column is touched
+INT_MIN, INT_MAX = -2**63, 2**63 - 1
+
+# How declared_size_kb was given, so the dict view returns the original type
+DECLARED_MISSING, DECLARED_INT, DECLARED_FLOAT = 0, 1, 2
+
+# (field, array typecode) for the fixed numeric columns, in report key order
+INT_FIELDS = (
+    ('size_bytes', 'q'),
+    ('line_count', 'q'),
+    ('char_count', 'q'),
+    ('word_count', 'q'),
+    ('letter_count', 'q'),
+    ('digit_count', 'q'),
+    ('special_count', 'q'),
+    ('csv_rows', 'q'),
+    ('csv_columns', 'q'),
+    ('valid_json_lines', 'q'),
+)
+
+
+class ResultStore:
+    """
+    Column-oriented store for per-file results.
+
+    Fixed numeric fields live in typed arrays (one entry per file) and file
+    types are interned into a lookup table. Top words are stored flat: word ids
+    into a shared vocabulary plus counts, with per-row offsets into both. Error
+    messages are rare, so they stay in a side table keyed by row index.
+    Use row()/as_dicts() for the original per-file dict layout.
+    """
+
+    def __init__(self):
+        self.filenames = []
+        self.type_names = []
+        self._type_codes = {}
+        self.type_idx = array('H')
+        self.status = array('b')
+        self.declared_kind = array('b')
+        self.declared_size_kb = array('d')
+        self.process_time = array('d')
+        self.ints = {field: array(code) for field, code in INT_FIELDS}
+        self.log_levels = {level: array('q') for level in LOG_LEVELS}
+        self.vocab = []
+        self._word_ids = {}
+        self.top_word_ids = array('I')
+        self.top_word_counts = array('q')
+        self.top_word_offsets = array('q', [0])
+        self.errors = {}
+
+    def __len__(self):
+        return len(self.status)
+
+    def __iter__(self):
+        return self.as_dicts()
+
+    def _type_code(self, file_type):
+        code = self._type_codes.get(file_type)
+        if code is None:
+            code = len(self.type_names)
+            self._type_codes[file_type] = code
+            self.type_names.append(file_type)
+        return code
+
+    def _word_id(self, word):
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.vocab)
+            self._word_ids[word] = word_id
+            self.vocab.append(word)
+        return word_id
+
+    @staticmethod
+    def _int(value):
+        value = int(value)
+        if not INT_MIN <= value <= INT_MAX:
+            raise OverflowError(f"{value} does not fit in a 64-bit column")
+        return value
+
+    def append(self, result):
+        """Add one result dict as produced by SequentialProcessor.process_file()"""
+        # Encode every field before touching a column so a bad record leaves the store unchanged
+        filename = result['filename']
+        status = STATUS_CODES.index(result['status'])
+        process_time = float(result['process_time'])
+        ints = [self._int(result.get(field, MISSING)) for field, _ in INT_FIELDS]
+
+        declared = result.get('declared_size_kb')
+        if declared is None:
+            declared_kind, declared = DECLARED_MISSING, 0.0
+        elif isinstance(declared, int):
+            declared_kind, declared = DECLARED_INT, float(declared)
+        else:
+            declared_kind, declared = DECLARED_FLOAT, float(declared)
+
+        levels = result.get('log_levels')
+        levels = [self._int(levels[level]) for level in LOG_LEVELS] if levels else [MISSING] * len(LOG_LEVELS)
+
+        top_words = [(word, self._int(count)) for word, count in result.get('top_words', {}).items()]
+
+        file_type = result.get('file_type')
+        if file_type not in self._type_codes and len(self.type_names) > 0xFFFF:
+            raise OverflowError('too many distinct file types')
+
+        row = len(self.status)
+        self.filenames.append(filename)
+        self.type_idx.append(self._type_code(file_type))
+        self.status.append(status)
+        self.declared_kind.append(declared_kind)
+        self.declared_size_kb.append(declared)
+        self.process_time.append(process_time)
+
+        for column, value in zip(self.ints.values(), ints):
+            column.append(value)
+        for column, value in zip(self.log_levels.values(), levels):
+            column.append(value)
+
+        for word, count in top_words:
+            self.top_word_ids.append(self._word_id(word))
+            self.top_word_counts.append(count)
+        self.top_word_offsets.append(len(self.top_word_ids))
+
+        if 'error' in result:
+            self.errors[row] = result['error']
+
+    def row(self, i):
+        """Rebuild the per-file dict for row i, with the original key order"""
+        filename = self.filenames[i]
+        status = STATUS_CODES[self.status[i]]
+
+        if status == 'error':
+            record = {
+                'filename': filename,
+                'status': status,
+                'error': self.errors.get(i, ''),
+                'process_time': self.process_time[i],
+            }
+        else:
+            record = {'filename': filename}
+            for field, _ in INT_FIELDS[:7]:
+                record[field] = self.ints[field][i]
+            start, end = self.top_word_offsets[i], self.top_word_offsets[i + 1]
+            record['top_words'] = {
+                self.vocab[word_id]: count
+                for word_id, count in zip(self.top_word_ids[start:end], self.top_word_counts[start:end])
+            }
+            for field, _ in INT_FIELDS[7:]:
+                value = self.ints[field][i]
+                if value != MISSING:
+                    record[field] = value
+            if self.log_levels['INFO'][i] != MISSING:
+                record['log_levels'] = {
+                    level: column[i] for level, column in self.log_levels.items()
+                }
+            record['process_time'] = self.process_time[i]
+            record['status'] = status
+
+        file_type = self.type_names[self.type_idx[i]]
+        if file_type is not None:
+            record['file_type'] = file_type
+        declared_kind = self.declared_kind[i]
+        if declared_kind == DECLARED_INT:
+            record['declared_size_kb'] = int(self.declared_size_kb[i])
+        elif declared_kind == DECLARED_FLOAT:
+            record['declared_size_kb'] = self.declared_size_kb[i]
+        return record
+
+    def as_dicts(self):
+        """Yield every record as a dict (JSON export view)"""
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def aggregate(self):
+        """Return (successful, aggregate_stats) over successful rows"""
+        # One C-level compress() pass per column, masked by status (success == 1),
+        # rather than a single Python loop touching every field of every row
+        mask = self.status
+        successful = mask.count(STATUS_CODES.index('success'))
+        if not successful:
+            return 0, None
+
+        return successful, {
+            'total_bytes_processed': sum(compress(self.ints['size_bytes'], mask)),
+            'total_words_processed': sum(compress(self.ints['word_count'], mask)),
+            'total_lines_processed': sum(compress(self.ints['line_count'], mask)),
+            'avg_process_time': sum(compress(self.process_time, mask)) / successful
+        }
+
 
 class SequentialProcessor:
     def __init__(self):
-        self.results = []
+        self.results = ResultStore()
         self.start_time = None
         self.end_time = None
     
@@ -77,7 +275,7 @@ class SequentialProcessor:
         
         return stats
     
-    def run(self, manifest_path='test-data/manifest.json'):
+    def run(self, manifest_path='test-data/manifest.json', include_file_results=True):
         """Process all files sequentially"""
         print("Starting sequential processing...")
         
@@ -98,12 +296,12 @@ class SequentialProcessor:
         self.end_time = time.time()
         print(f"\nCompleted processing {len(files)} files")
         
-        return self.generate_report()
+        return self.generate_report(include_file_results)
     
-    def generate_report(self):
+    def generate_report(self, include_file_results=True):
         """Generate performance report"""
         total_time = self.end_time - self.start_time
-        successful = sum(1 for r in self.results if r['status'] == 'success')
+        successful, aggregate_stats = self.results.aggregate()
         failed = len(self.results) - successful
         
         report = {
@@ -122,28 +320,56 @@ class SequentialProcessor:
                 'end_time': self.end_time,
                 'duration': total_time
             },
-            'file_results': self.results
         }
         
-        # Calculate aggregate statistics
-        if successful > 0:
-            success_results = [r for r in self.results if r['status'] == 'success']
-            report['aggregate_stats'] = {
-                'total_bytes_processed': sum(r['size_bytes'] for r in success_results),
-                'total_words_processed': sum(r['word_count'] for r in success_results),
-                'total_lines_processed': sum(r['line_count'] for r in success_results),
-                'avg_process_time': sum(r['process_time'] for r in success_results) / len(success_results)
-            }
+        # Per-file dicts are only materialized for JSON export
+        if include_file_results:
+            report['file_results'] = list(self.results.as_dicts())
+        
+        if aggregate_stats is not None:
+            report['aggregate_stats'] = aggregate_stats
         
         return report
 
+
+def dump_report(report, file_results, f, indent=2):
+    """
+    Write report as JSON with file_results streamed in one record at a time.
+
+    Produces the same text as json.dump() on the report with the per-file list
+    in place, without ever holding that list in memory.
+    """
+    pad = ' ' * indent
+    keys = list(report)
+    # file_results goes where generate_report() would have put it
+    position = keys.index('performance') + 1 if 'performance' in keys else len(keys)
+    keys.insert(position, 'file_results')
+
+    f.write('{')
+    for n, key in enumerate(keys):
+        f.write(',' if n else '')
+        f.write(f"\n{pad}{json.dumps(key)}: ")
+        if key != 'file_results':
+            f.write(json.dumps(report[key], indent=indent).replace('\n', '\n' + pad))
+            continue
+
+        empty = True
+        for record in file_results:
+            f.write(',' if not empty else '[')
+            f.write(f"\n{pad * 2}")
+            f.write(json.dumps(record, indent=indent).replace('\n', '\n' + pad * 2))
+            empty = False
+        f.write('[]' if empty else f"\n{pad}]")
+    f.write('\n}' if keys else '}')
+
+
 if __name__ == "__main__":
     processor = SequentialProcessor()
-    report = processor.run()
+    report = processor.run(include_file_results=False)
     
-    # Save detailed report
+    # Save detailed report, streaming the per-file records from the store
     with open('results/sequential-report.json', 'w') as f:
-        json.dump(report, f, indent=2)
+        dump_report(report, processor.results.as_dicts(), f)
     
     # Print summary
     print("\n=== Sequential Processing Summary ===")
@@ -0,0 +1,179 @@
+"""
+Tests for the sequential result store, report export and the lease queue
+"""
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+TASKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename):
+    # The scripts have hyphenated filenames, so load them by path
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), os.path.join(TASKS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+sequential = load_script('process-files-sequential.py')
+distributed = load_script('process-files-distributed.py')
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """One file of each type plus a missing one, with a manifest"""
+    contents = {
+        'notes.txt': 'Lorem ipsum dolor sit amet.\nLorem ipsum 42!\n',
+        'rows.csv': 'id,name\n1,alpha\n2,beta\n',
+        'records.jsonl': '{"id": 1}\nnot json\n{"id": 2}\n',
+        'app.log': '[2025-06-28] [INFO] [api] ok\n[2025-06-28] [ERROR] [db] failed\n',
+    }
+    types = {'txt': 'text', 'csv': 'csv', 'jsonl': 'json', 'log': 'log'}
+    manifest = []
+    for filename, content in contents.items():
+        (tmp_path / filename).write_text(content)
+        manifest.append({
+            'filename': filename,
+            'type': types[filename.rsplit('.', 1)[1]],
+            'size_kb': 1,
+            'path': str(tmp_path / filename)
+        })
+    manifest.append({'filename': 'gone.txt', 'type': 'text', 'size_kb': 2.0, 'path': str(tmp_path / 'gone.txt')})
+
+    manifest_path = tmp_path / 'manifest.json'
+    manifest_path.write_text(json.dumps(manifest))
+    return manifest_path
+
+
+def process_as_dicts(manifest_path):
+    """Per-file dicts exactly as the pre-ResultStore processor built them"""
+    processor = sequential.SequentialProcessor()
+    results = []
+    for file_info in json.loads(manifest_path.read_text()):
+        result = processor.process_file(file_info['path'])
+        result['file_type'] = file_info['type']
+        result['declared_size_kb'] = file_info['size_kb']
+        results.append(result)
+    return results
+
+
+def test_row_round_trip(corpus):
+    expected = process_as_dicts(corpus)
+    store = sequential.ResultStore()
+    for result in expected:
+        store.append(result)
+
+    rows = list(store.as_dicts())
+    assert rows == expected
+    assert [list(row) for row in rows] == [list(result) for result in expected]
+    assert json.dumps(rows) == json.dumps(expected)
+
+
+def test_append_rejects_bad_record_without_partial_write(corpus):
+    good = process_as_dicts(corpus)[0]
+    store = sequential.ResultStore()
+    store.append(good)
+
+    with pytest.raises(ValueError):
+        store.append(dict(good, status='unknown'))
+    with pytest.raises(OverflowError):
+        store.append(dict(good, size_bytes=2**64))
+
+    store.append(good)
+    assert len(store) == 2
+    assert len(store.filenames) == 2
+    assert all(len(column) == 2 for column in store.ints.values())
+    assert len(store.top_word_offsets) == 3
+    assert store.row(1) == good
+
+
+def test_aggregate_matches_dict_sums(corpus):
+    expected = process_as_dicts(corpus)
+    store = sequential.ResultStore()
+    for result in expected:
+        store.append(result)
+
+    successes = [r for r in expected if r['status'] == 'success']
+    successful, stats = store.aggregate()
+    assert successful == len(successes) == len(expected) - 1
+    assert stats['total_bytes_processed'] == sum(r['size_bytes'] for r in successes)
+    assert stats['total_words_processed'] == sum(r['word_count'] for r in successes)
+    assert stats['total_lines_processed'] == sum(r['line_count'] for r in successes)
+    assert sequential.ResultStore().aggregate() == (0, None)
+
+
+def test_dump_report_matches_json_dump(corpus):
+    processor = sequential.SequentialProcessor()
+    report = processor.run(str(corpus), include_file_results=False)
+
+    streamed = io.StringIO()
+    sequential.dump_report(report, processor.results.as_dicts(), streamed)
+
+    full = processor.generate_report()
+    full['timestamp'] = report['timestamp']
+    assert streamed.getvalue() == json.dumps(full, indent=2)
+
+
+def run_workers(db_path, count=2, lease=30, max_attempts=3):
+    """Run count worker processes against one queue file and wait for them"""
+    command = [
+        sys.executable, os.path.join(TASKS_DIR, 'process-files-distributed.py'), 'work',
+        '--db', str(db_path), '--batch-size', '2', '--lease', str(lease), '--max-attempts', str(max_attempts)
+    ]
+    workers = [subprocess.Popen(command, stdout=subprocess.DEVNULL) for _ in range(count)]
+    assert [worker.wait(timeout=60) for worker in workers] == [0] * count
+
+
+def without_timing(rows):
+    return [{k: v for k, v in row.items() if k != 'process_time'} for row in rows]
+
+
+def test_workers_match_sequential(corpus, tmp_path):
+    db_path = tmp_path / 'queue.db'
+    queue = distributed.LeaseQueue(str(db_path))
+    queue.init(str(corpus))
+    with pytest.raises(RuntimeError):
+        queue.init(str(corpus))
+    queue.close()
+
+    run_workers(db_path)
+
+    report, results = distributed.merge_report(str(db_path))
+    assert without_timing(results.as_dicts()) == without_timing(process_as_dicts(corpus))
+    assert report['summary']['total_files'] == 5
+    assert report['summary']['failed'] == 1
+
+
+def test_expired_leases_are_reclaimed_or_failed(corpus, tmp_path):
+    db_path = tmp_path / 'queue.db'
+    queue = distributed.LeaseQueue(str(db_path), lease_seconds=0.2, max_attempts=2)
+    queue.init(str(corpus))
+
+    # A worker that dies twice on the first two files, and once on the rest
+    assert len(queue.claim('dead', 5)) == 5
+    time.sleep(0.3)
+    assert [task['id'] for task in queue.claim('dead', 2)] == [0, 1]
+    time.sleep(0.3)
+
+    with pytest.raises(RuntimeError):
+        distributed.merge_report(str(db_path))
+
+    run_workers(db_path, lease=0.2, max_attempts=2)
+    assert queue.counts() == {'done': 3, 'failed': 2}
+
+    # A late write from the dead worker does not replace the real result
+    queue.complete('dead', [({'id': 2, 'claimed_at': 0.0}, {'bogus': True})])
+    queue.close()
+
+    report, results = distributed.merge_report(str(db_path))
+    rows = list(results.as_dicts())
+    assert [row['error'] for row in rows[:2]] == ['lease expired 2 times'] * 2
+    assert without_timing(rows[2:]) == without_timing(process_as_dicts(corpus)[2:])
+    assert report['summary']['failed'] == 3